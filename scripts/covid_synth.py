@@ -0,0 +1,157 @@
+"""
+Synthetic COVID-19 genetic risk variant generator shared by the tutorial scripts
+"""
+
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Define lists of realistic genetic data
+chromosomes = [f"chr{i}" for i in range(1, 23)] + ["chrX", "chrY"]
+functional_consequences = [
+    "missense_variant", "synonymous_variant", "intron_variant",
+    "upstream_gene_variant", "downstream_gene_variant", "3_prime_UTR_variant",
+    "5_prime_UTR_variant", "splice_region_variant", "regulatory_region_variant"
+]
+
+# COVID-19 related genes from literature
+covid_genes = [
+    "ACE2", "TMPRSS2", "IFNAR2", "TYK2", "OAS1", "OAS2", "OAS3", "IFIH1",
+    "IRF7", "IRF3", "STAT1", "STAT2", "IL6", "IL1B", "TNF", "CCL2",
+    "CXCL10", "IFNG", "IL10", "IL4", "IL13", "CD14", "TLR3", "TLR7",
+    "TLR8", "MYD88", "IRAK4", "IRF8", "NLRP3", "CASP1", "IL18",
+    "HMGB1", "S100A8", "S100A9", "LCN2", "RETN", "ADIPOQ", "LEP",
+    "CRP", "SAA1", "APOE", "LDLR", "PCSK9", "ANGPT2", "VWF",
+    "F8", "SERPINE1", "PLAT", "PLG", "FGB", "FGA", "FGG",
+    "PROC", "PROS1", "THBD", "EPCR", "TFPI", "AT3", "PC"
+]
+
+# Related diseases
+related_diseases = [
+    "Severe COVID-19", "Respiratory failure", "ARDS", "Pneumonia",
+    "Thrombosis", "Cardiovascular disease", "Diabetes", "Hypertension",
+    "Immune deficiency", "Inflammatory response", "Cytokine storm",
+    "Sepsis", "Multi-organ failure", "Coagulopathy"
+]
+
+study_populations = ['European', 'East Asian', 'Mixed', 'Middle Eastern']
+
+# Datasets at least this large draw their integer and categorical columns across threads
+PARALLEL_MIN_VARIANTS = 1_000_000
+# Rows per independently seeded block in the parallel path
+PARALLEL_BLOCK_SIZE = 65_536
+
+if njit is not None:
+    # cache=True keeps the compiled kernel on disk, so only the first run pays for JIT
+    @njit(parallel=True, cache=True)
+    def _draw_numeric_cols(block_seeds, block_size, out_rs, out_pos, out_size, out_chr_idx, out_conseq_idx,
+                           out_gene_idx, out_disease_idx, out_pop_idx, n_chr, n_conseq, n_gene, n_disease, n_pop):
+        n = out_rs.shape[0]
+        for b in prange(block_seeds.shape[0]):
+            # Reseeding the running thread per block makes the draws independent of
+            # thread count and scheduling
+            np.random.seed(block_seeds[b])
+            for i in range(b * block_size, min((b + 1) * block_size, n)):
+                out_rs[i] = np.random.randint(1000000, 100000000)
+                out_pos[i] = np.random.randint(1000000, 200000001)
+                out_size[i] = np.random.randint(500, 50001)
+                out_chr_idx[i] = np.random.randint(0, n_chr)
+                out_conseq_idx[i] = np.random.randint(0, n_conseq)
+                out_gene_idx[i] = np.random.randint(0, n_gene)
+                out_disease_idx[i] = np.random.randint(0, n_disease)
+                out_pop_idx[i] = np.random.randint(0, n_pop)
+
+def _draw_cols_parallel(rng, n_variants, genes):
+    rs_ints, position, sample_size = (np.empty(n_variants, dtype=np.int64) for _ in range(3))
+    chr_idx, conseq_idx, gene_idx, disease_idx, pop_idx = (np.empty(n_variants, dtype=np.intp) for _ in range(5))
+
+    # One seed per fixed-size block, all derived from the caller's generator
+    n_blocks = (n_variants + PARALLEL_BLOCK_SIZE - 1) // PARALLEL_BLOCK_SIZE
+    block_seeds = np.random.SeedSequence(int(rng.integers(2**63))).generate_state(n_blocks)
+    _draw_numeric_cols(block_seeds, PARALLEL_BLOCK_SIZE, rs_ints, position, sample_size,
+                       chr_idx, conseq_idx, gene_idx, disease_idx, pop_idx,
+                       len(chromosomes), len(functional_consequences), len(genes),
+                       len(related_diseases), len(study_populations))
+
+    return {
+        'rs_ints': rs_ints,
+        'chromosome': chr_idx,
+        'position': position,
+        'functional_consequence': conseq_idx,
+        'host_gene': gene_idx,
+        'related_disease': disease_idx,
+        'study_population': pop_idx,
+        'sample_size': sample_size
+    }
+
+def _draw_cols_serial(rng, n_variants, genes):
+    # Integer codes consume the generator exactly like rng.choice on the label lists
+    return {
+        'rs_ints': rng.integers(1000000, 100000000, n_variants),
+        'chromosome': rng.integers(0, len(chromosomes), n_variants),
+        'position': rng.integers(1000000, 200000001, n_variants),
+        'functional_consequence': rng.integers(0, len(functional_consequences), n_variants),
+        'host_gene': rng.integers(0, len(genes), n_variants),
+        'related_disease': rng.integers(0, len(related_diseases), n_variants),
+        'study_population': rng.integers(0, len(study_populations), n_variants),
+        'sample_size': rng.integers(500, 50001, n_variants)
+    }
+
+def _categorical(labels, idx):
+    """Categorical column straight from draw indices, with the drawn labels as sorted categories."""
+    labels = np.asarray(labels)
+    order = np.argsort(labels, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.size)
+    return pd.Categorical.from_codes(rank[idx], categories=labels[order]).remove_unused_categories()
+
+def generate(n_variants=109, seed=42, genes=None, parallel=None):
+    """Generate a synthetic variant table; `genes` defaults to the full COVID-19 gene list
+    (duplicate names are dropped, keeping first occurrence).
+
+    The serial and parallel (Numba) paths consume randomness differently, so the same seed
+    gives different data on each. `parallel=None` picks the parallel path when numba is
+    installed and n_variants >= PARALLEL_MIN_VARIANTS; pass True or False to pin it.
+    """
+    rng = np.random.default_rng(seed)
+    # Categories must be unique, so repeated gene names are collapsed
+    genes = covid_genes if genes is None else list(dict.fromkeys(genes))
+
+    if parallel is None:
+        parallel = njit is not None and n_variants >= PARALLEL_MIN_VARIANTS
+    elif parallel and njit is None:
+        raise ImportError("generate(parallel=True) requires numba")
+
+    if parallel:
+        cols = _draw_cols_parallel(rng, n_variants, genes)
+    else:
+        cols = _draw_cols_serial(rng, n_variants, genes)
+
+    # Generate rs IDs and chromosomal locations
+    rs_id = pc.binary_join_element_wise('rs', pc.cast(pa.array(cols['rs_ints']), pa.string()), '')
+    location = pc.binary_join_element_wise(pc.take(pa.array(chromosomes), pa.array(cols['chromosome'])),
+                                           pc.cast(pa.array(cols['position']), pa.string()), ':')
+
+    # One typed array per column; string columns are categoricals built from the drawn codes,
+    # and numbers use the smallest dtype that holds their range (positions < 2**31)
+    data = {
+        'rs_id': pd.array(rs_id, dtype='string[pyarrow]'),
+        'chromosome': _categorical(chromosomes, cols['chromosome']),
+        'position': cols['position'].astype(np.int32),
+        'chromosomal_location': pd.array(location, dtype='string[pyarrow]'),
+        'functional_consequence': _categorical(functional_consequences, cols['functional_consequence']),
+        'host_gene': _categorical(genes, cols['host_gene']),
+        # Significant variants only
+        'p_value': rng.uniform(1e-8, 5e-5, n_variants).astype(np.float32),
+        'allele_frequency': rng.uniform(0.01, 0.5, n_variants).astype(np.float32),
+        'odds_ratio': rng.uniform(1.1, 3.5, n_variants).astype(np.float32),
+        'related_disease': _categorical(related_diseases, cols['related_disease']),
+        'study_population': _categorical(study_populations, cols['study_population']),
+        'sample_size': cols['sample_size'].astype(np.int32)
+    }
+    return pd.DataFrame(data, copy=False)
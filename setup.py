@@ -57,6 +57,10 @@ setup(
             "bioservices>=1.8.0",
             "gprofiler-official>=1.0.0",
         ],
+        "fast": [
+            "igraph>=0.10.0",
+            "numba>=0.56.0",
+        ],
     },
     include_package_data=True,
     package_data={